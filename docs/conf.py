@@ -113,6 +113,5 @@ autodoc_mock_imports = [
     "semver",
     "tqdm",
     "usb",
-    "validators",
 ]
 autoclass_content = "both"
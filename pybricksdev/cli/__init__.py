@@ -5,16 +5,18 @@
 
 import argparse
 import asyncio
+import collections
 import contextlib
+import ipaddress
 import logging
 import os
 import sys
 from tempfile import NamedTemporaryFile
 from typing import ContextManager, TextIO
-import validators
 
 from abc import ABC, abstractmethod
 from os import PathLike, path
+from pathlib import Path
 
 import argcomplete
 from argcomplete.completers import FilesCompleter
@@ -24,6 +26,10 @@ from ..ble.lwp3 import LWP3_BOOTLOADER_SERVICE_UUID
 from ..ble.lwp3.bytecodes import HubKind
 
 
+# File completers are shared between tools instead of creating one per argument.
+_BIN_FILES = FilesCompleter(allowednames=(".bin",))
+_ZIP_FILES = FilesCompleter(allowednames=(".zip",))
+
 PROG_NAME = (
     f"{path.basename(sys.executable)} -m {MODULE_NAME}"
     if sys.argv[0].endswith("__main__.py")
@@ -93,6 +99,16 @@ def _get_script_path(file: TextIO) -> ContextManager[PathLike]:
     return contextlib.nullcontext(file.name)
 
 
+def _positive_int(value: str) -> int:
+    """Argument type for integers that must be at least 1."""
+    number = int(value)
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+
+    return number
+
+
 class Compile(Tool):
     def add_parser(self, subparsers: argparse._SubParsersAction):
         parser = subparsers.add_parser(
@@ -102,17 +118,46 @@ class Compile(Tool):
         parser.add_argument(
             "file",
             metavar="<file>",
-            help="path to a MicroPython script or `-` for stdin",
+            nargs="+",
+            help="path to one or more MicroPython scripts or `-` for stdin",
             type=argparse.FileType(),
         )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            metavar="<n>",
+            type=_positive_int,
+            default=os.cpu_count() or 1,
+            help="number of scripts to compile in parallel (default: %(default)s)",
+        )
         parser.tool = self
 
     async def run(self, args: argparse.Namespace):
         from ..compile import compile_file, print_mpy
 
-        with _get_script_path(args.file) as script_path:
-            mpy = await compile_file(script_path)
-        print_mpy(mpy)
+        if sum(f is sys.stdin for f in args.file) > 1:
+            print("`-` can only be given once", file=sys.stderr)
+            exit(1)
+
+        jobs = asyncio.Semaphore(args.jobs)
+
+        # compile_file() writes to build/<name>.mpy, so scripts with the same
+        # name must not be compiled at the same time.
+        name_locks = collections.defaultdict(asyncio.Lock)
+
+        async def compile_one(file: TextIO) -> bytes:
+            with _get_script_path(file) as script_path:
+                async with name_locks[Path(script_path).stem], jobs:
+                    return await compile_file(script_path)
+
+        mpys = await asyncio.gather(*(compile_one(f) for f in args.file))
+
+        for file, mpy in zip(args.file, mpys):
+            # Say which script each dump belongs to if there are several
+            if len(args.file) > 1:
+                print(f"{file.name}:")
+
+            print_mpy(mpy)
 
 
 class Run(Tool):
@@ -182,8 +227,10 @@ class Run(Tool):
                 print("--name is required for SSH connections", file=sys.stderr)
                 exit(1)
 
-            if not validators.ip_address.ipv4(args.name):
-                raise ValueError("Device must be IP address.")
+            try:
+                ipaddress.IPv4Address(args.name)
+            except ValueError:
+                raise ValueError("Device must be IP address.") from None
 
             hub = EV3Connection()
             device_or_address = args.name
@@ -229,7 +276,7 @@ class Flash(Tool):
             metavar="<firmware-file>",
             type=argparse.FileType(mode="rb"),
             help="the firmware .zip file",
-        ).completer = FilesCompleter(allowednames=(".zip",))
+        ).completer = _ZIP_FILES
 
         parser.add_argument(
             "-n", "--name", metavar="<name>", type=str, help="a custom name for the hub"
@@ -273,7 +320,7 @@ class DFUBackup(Tool):
             metavar="<firmware-file>",
             type=argparse.FileType(mode="wb"),
             help="the firmware .bin file",
-        ).completer = FilesCompleter(allowednames=(".bin",))
+        ).completer = _BIN_FILES
 
     async def run(self, args: argparse.Namespace):
         from ..dfu import backup_dfu
@@ -293,7 +340,7 @@ class DFURestore(Tool):
             metavar="<firmware-file>",
             type=argparse.FileType(mode="rb"),
             help="the firmware .bin file",
-        ).completer = FilesCompleter(allowednames=(".bin",))
+        ).completer = _BIN_FILES
 
     async def run(self, args: argparse.Namespace):
         from ..dfu import restore_dfu
@@ -2,10 +2,13 @@
 # Copyright (c) 2019-2020 The Pybricks Authors
 
 import asyncio
+import io
 import logging
 import os
+import sys
 from pathlib import Path
 from subprocess import Popen, PIPE
+from tempfile import TemporaryDirectory
 
 import mpy_cross
 
@@ -17,15 +20,25 @@ BUILD_DIR = "build"
 TMP_PY_SCRIPT = "_tmp.py"
 TMP_MPY_SCRIPT = "_tmp.mpy"
 
+# Output of ``mpy-cross --version`` by path to mpy-cross, cached since it can't
+# change while we run.
+_mpy_cross_versions = {}
+
+# Pending ``mpy-cross --version`` calls by path to mpy-cross, so that compiles
+# that are started at the same time share a single process.
+_mpy_cross_version_probes = {}
+
+# C hex literal for each possible byte value, used by print_mpy().
+_HEX_BYTES = tuple(f"0x{b:02X}" for b in range(256))
+
 
 def make_build_dir():
     # Create build folder if it does not exist
-    if not os.path.exists(BUILD_DIR):
-        os.mkdir(BUILD_DIR)
-
-    # Raise error if there happens to be a file by this name
-    if os.path.isfile(BUILD_DIR):
-        raise FileExistsError("A file named build already exists.")
+    try:
+        os.makedirs(BUILD_DIR, exist_ok=True)
+    except FileExistsError:
+        # Raise error if there happens to be a file by this name
+        raise FileExistsError("A file named build already exists.") from None
 
 
 async def run_mpy_cross(args):
@@ -54,13 +67,17 @@ async def run_mpy_cross(args):
     except NotImplementedError:
         # This error happens when running on Windows with WindowsSelectorEventLoopPolicy()
         # which is the required policy for ipython kernels due to a requirement
-        # by the tornado package. So in that case, we call the subprocess synchronously
-        # which shouldn't be a big deal for running in notebooks. Python versions
-        # before 3.8 also used WindowsSelectorEventLoopPolicy() by default, but
-        # pybricksdev requires at least Python 3.8, so that shouldn't be a problem.
+        # by the tornado package. So in that case, we call the subprocess
+        # synchronously and wait for it in a worker thread so that we don't
+        # block the event loop (e.g. when compiling several scripts at once).
+        # Python versions before 3.8 also used WindowsSelectorEventLoopPolicy()
+        # by default, but pybricksdev requires at least Python 3.8, so that
+        # shouldn't be a problem.
         logger.debug("calling mpy-cross synchronously")
         proc = Popen([mpy_cross.mpy_cross, *args], stdout=PIPE, stderr=PIPE)
-        stdout, stderr = proc.communicate()
+        stdout, stderr = await asyncio.get_running_loop().run_in_executor(
+            None, proc.communicate
+        )
 
     if proc.returncode != 0:
         raise RuntimeError(stderr.decode())
@@ -88,9 +105,56 @@ async def compile_file(path, compile_args=["-mno-unicode"], mpy_version=5):
         ValueError if mpy-cross ABI version does not match packaged version.
     """
 
-    # Get version info
-    out = await run_mpy_cross(["--version"])
-    installed_mpy_version = int(out.strip()[-1])
+    # Make the build directory
+    make_build_dir()
+
+    # Cross-compile Python file to .mpy and raise errors if any
+    mpy_path = os.path.join(BUILD_DIR, Path(path).stem + ".mpy")
+    return await _compile(path, mpy_path, compile_args, mpy_version)
+
+
+async def compile_str(py_string, compile_args=["-mno-unicode"], mpy_version=5):
+    """Compiles a MicroPython script given as a string and return as bytes.
+
+    mpy-cross can only read and write files, so the script and the compiled
+    output only live in a temporary directory for the duration of the call.
+
+    Arguments:
+        py_string (str):
+            Source code of the script that is to be compiled.
+        compile_args (dict):
+            Extra arguments for mpy-cross.
+        mpy_version (int):
+            Expected mpy ABI version.
+
+    Returns:
+        bytes: compiled script in mpy format.
+
+    Raises:
+        RuntimeError with stderr if mpy-cross fails.
+        ValueError if mpy-cross ABI version does not match packaged version.
+    """
+    with TemporaryDirectory() as temp_dir:
+        py_path = os.path.join(temp_dir, TMP_PY_SCRIPT)
+        mpy_path = os.path.join(temp_dir, TMP_MPY_SCRIPT)
+
+        with open(py_path, "w") as f:
+            f.write(py_string)
+            f.write("\n")
+
+        # Don't embed the random temporary path in the .mpy file
+        compile_args = compile_args + ["-s", TMP_PY_SCRIPT]
+
+        return await _compile(py_path, mpy_path, compile_args, mpy_version)
+
+
+async def _compile(py_path, mpy_path, compile_args, mpy_version):
+    """Cross-compiles ``py_path`` to ``mpy_path`` and returns the .mpy bytes."""
+
+    # Get version info, only spawning mpy-cross for it the first time
+    version = await _get_mpy_cross_version()
+
+    installed_mpy_version = int(version.strip()[-1])
     if installed_mpy_version != mpy_version:
         raise ValueError(
             "Expected mpy-cross ABI v{0} but v{1} is installed.".format(
@@ -98,18 +162,39 @@ async def compile_file(path, compile_args=["-mno-unicode"], mpy_version=5):
             )
         )
 
-    # Make the build directory
-    make_build_dir()
-
     # Cross-compile Python file to .mpy and raise errors if any
-    mpy_path = os.path.join(BUILD_DIR, Path(path).stem + ".mpy")
-    await run_mpy_cross([path] + compile_args + ["-o", mpy_path])
+    await run_mpy_cross([py_path] + compile_args + ["-o", mpy_path])
 
     # Read the .mpy file and return as bytes
     with open(mpy_path, "rb") as mpy:
         return mpy.read()
 
 
+async def _get_mpy_cross_version():
+    """Gets the output of ``mpy-cross --version``, spawning it only once."""
+    path = mpy_cross.mpy_cross
+
+    try:
+        return _mpy_cross_versions[path]
+    except KeyError:
+        pass
+
+    probe = _mpy_cross_version_probes.get(path)
+
+    if probe is None:
+        probe = asyncio.ensure_future(run_mpy_cross(["--version"]))
+        probe.add_done_callback(lambda _: _mpy_cross_version_probes.pop(path))
+        _mpy_cross_version_probes[path] = probe
+
+    # Shielded so that cancelling one compile doesn't cancel the probe for
+    # all other compiles waiting on it.
+    version = await asyncio.shield(probe)
+    logger.debug("mpy-cross version: %s", version.strip())
+    _mpy_cross_versions[path] = version
+
+    return version
+
+
 def save_script(py_string):
     """Save a MicroPython one-liner to a file."""
     # Make the build directory.
@@ -128,20 +213,22 @@ def save_script(py_string):
 
 
 def print_mpy(data):
+    out = io.StringIO()
+
     # Print as string as a sanity check.
-    print()
-    print("Bytes:")
-    print(data)
+    out.write(f"\nBytes:\n{data}\n")
 
     # Print the bytes as a C byte array for development of new MicroPython
     # ports without usable I/O, REPL or otherwise.
     WIDTH = 8
-    print()
-    print(f"// MPY file. Version: {data[1]}. Size: {len(data)} bytes")
-    print("const uint8_t script[] = {")
+    out.write(f"\n// MPY file. Version: {data[1]}. Size: {len(data)} bytes\n")
+    out.write("const uint8_t script[] = {\n")
+
+    hex_repr = [_HEX_BYTES[b] for b in data]
+    for c in chunk(hex_repr, WIDTH):
+        out.write(f"    {', '.join(c)},\n")
 
-    for c in chunk(data, WIDTH):
-        hex_repr = [f"0x{i:02X}" for i in c]
-        print(f"    {', '.join(hex_repr)},")
+    out.write("};\n")
 
-    print("};")
+    # Print everything with a single write
+    sys.stdout.write(out.getvalue())
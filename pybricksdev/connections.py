@@ -3,6 +3,7 @@
 
 import asyncio
 import base64
+import itertools
 import json
 import logging
 import os
@@ -469,6 +470,11 @@ class EV3Connection:
     _USER = "robot"
     _PASSWORD = "maker"
 
+    # Larger than the asyncssh default of 16 KiB so that uploads need fewer
+    # SFTP write requests, but well below the 256 KiB message size limit of
+    # the OpenSSH SFTP server on ev3dev.
+    _SFTP_BLOCK_SIZE = 64 * 1024
+
     def abs_path(self, path):
         return os.path.join(self._HOME, path)
 
@@ -489,8 +495,9 @@ class EV3Connection:
             address, username=self._USER, password=self._PASSWORD
         )
         print("Connected.", end=" ")
+        # All remote paths are made absolute with abs_path(), so there is no
+        # need to spend a round trip on changing the SFTP working directory.
         self.client.sftp = await self.client.start_sftp_client()
-        await self.client.sftp.chdir(self._HOME)
         print("Opened SFTP.")
 
     async def beep(self):
@@ -516,16 +523,21 @@ class EV3Connection:
 
         # Make sure same directory structure exists on EV3
         if not await self.client.sftp.exists(self.abs_path(dirs)):
-            # If not, make the folders one by one
-            total = ""
-            for name in dirs.split(os.sep):
-                total = os.path.join(total, name)
-                if not await self.client.sftp.exists(self.abs_path(total)):
-                    await self.client.sftp.mkdir(self.abs_path(total))
+            # If not, check all levels at once instead of one round trip each
+            # and then make the missing folders one by one
+            paths = list(itertools.accumulate(dirs.split(os.sep), os.path.join))
+            exists = await asyncio.gather(
+                *(self.client.sftp.exists(self.abs_path(p)) for p in paths)
+            )
+            for p, e in zip(paths, exists):
+                if not e:
+                    await self.client.sftp.mkdir(self.abs_path(p))
 
         # Send script to EV3
         remote_path = self.abs_path(local_path)
-        await self.client.sftp.put(local_path, remote_path)
+        await self.client.sftp.put(
+            local_path, remote_path, block_size=self._SFTP_BLOCK_SIZE
+        )
         return remote_path
 
     async def run(self, local_path, wait=True):
@@ -548,16 +560,31 @@ class EV3Connection:
         prog = "brickrun -r -- pybricks-micropython {0}".format(remote_path)
 
         # Run process asynchronously and print output as it comes in
-        async with self.client.create_process(prog) as process:
-            # Keep going until the process is done
-            while process.exit_status is None and wait:
-                try:
-                    line = await asyncio.wait_for(
-                        process.stderr.readline(), timeout=0.1
-                    )
-                    print(line.strip())
-                except asyncio.TimeoutError:
-                    pass
+        async with self.client.create_process(prog, encoding=None) as process:
+            if wait:
+                buf = bytearray()
+
+                # Keep going until the process closes stderr. Read whatever is
+                # available instead of a line at a time so chatty programs
+                # don't need an await for each line.
+                while True:
+                    data = await process.stderr.read(64 * 1024)
+                    if not data:
+                        break
+
+                    buf += data
+
+                    # Print all complete lines and keep the rest in the buffer
+                    end = buf.rfind(b"\n") + 1
+                    for line in buf[:end].splitlines():
+                        print(line.decode().strip())
+                    del buf[:end]
+
+                # Print any output that did not end with a newline
+                if buf:
+                    print(buf.decode().strip())
+
+                await process.wait()
 
     async def get(self, remote_path, local_path=None):
         """Gets a file from the EV3 over sftp.
@@ -20,7 +20,7 @@ from tqdm.contrib.logging import logging_redirect_tqdm
 from .ble import BLERequestsConnection
 from .ble.lwp3 import BootloaderCommand
 from .ble.lwp3.bytecodes import HubKind
-from .compile import compile_file, save_script
+from .compile import compile_str
 from .tools.checksum import crc32_checksum, sum_complement
 
 logger = logging.getLogger(__name__)
@@ -53,8 +53,8 @@ async def create_firmware(
     main_py = io.TextIOWrapper(archive.open("main.py"))
     metadata = json.load(archive.open("firmware.metadata.json"))
 
-    mpy = await compile_file(
-        save_script(main_py.read()),
+    mpy = await compile_str(
+        main_py.read(),
         metadata["mpy-cross-options"],
         metadata["mpy-abi-version"],
     )
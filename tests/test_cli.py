@@ -0,0 +1,50 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 The Pybricks Authors
+
+import argparse
+import asyncio
+import sys
+
+import pytest
+
+from pybricksdev.cli import Compile
+
+
+def test_compile_files_with_same_name(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+
+    for name in "ab":
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "main.py").write_text(f"print('{name * 5}')\n")
+
+    args = argparse.Namespace(
+        file=[open("a/main.py"), open("b/main.py")],
+        jobs=2,
+    )
+    asyncio.run(Compile().run(args))
+
+    out = capsys.readouterr().out
+    a_start = out.index("a/main.py:\n\nBytes:")
+    b_start = out.index("};\nb/main.py:\n\nBytes:")
+
+    assert a_start < b_start
+    assert "aaaaa" in out[a_start:b_start]
+    assert "bbbbb" not in out[a_start:b_start]
+    assert "bbbbb" in out[b_start:]
+    assert out.count("const uint8_t script[] = {") == 2
+
+
+def test_compile_stdin_more_than_once():
+    args = argparse.Namespace(file=[sys.stdin, sys.stdin], jobs=1)
+
+    with pytest.raises(SystemExit):
+        asyncio.run(Compile().run(args))
+
+
+@pytest.mark.parametrize("jobs", ["0", "-1", "x"])
+def test_compile_jobs_invalid(jobs):
+    parser = argparse.ArgumentParser()
+    Compile().add_parser(parser.add_subparsers())
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(["compile", "--jobs", jobs, "-"])
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 The Pybricks Authors
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from pybricksdev import compile
+from pybricksdev.compile import compile_file, compile_str
+
+
+def test_compile_file_checks_version_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scripts = []
+
+    for name in "abc":
+        script = tmp_path / f"{name}.py"
+        script.write_text(f"print('{name}')\n")
+        scripts.append(str(script))
+
+    async def compile_concurrently():
+        return await asyncio.gather(*(compile_file(s) for s in scripts))
+
+    with patch.object(compile, "_mpy_cross_versions", {}), patch.object(
+        compile, "run_mpy_cross", wraps=compile.run_mpy_cross
+    ) as run_mpy_cross:
+        mpys = asyncio.run(compile_concurrently())
+        again = asyncio.run(compile_file(scripts[0]))
+
+    assert again == mpys[0]
+
+    for name, mpy in zip("abc", mpys):
+        assert mpy[0] == ord("M")
+        assert mpy[1] == 5
+        assert name.encode() in mpy
+
+    version_calls = [
+        c for c in run_mpy_cross.call_args_list if c.args[0] == ["--version"]
+    ]
+    assert len(version_calls) == 1
+
+
+def test_compile_file_cancel_while_checking_version(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    script = tmp_path / "script.py"
+    script.write_text("print('hello')\n")
+
+    run_mpy_cross = compile.run_mpy_cross
+
+    async def main():
+        version_requested = asyncio.Event()
+        release_version = asyncio.Event()
+
+        async def slow_run_mpy_cross(args):
+            if args == ["--version"]:
+                version_requested.set()
+                await release_version.wait()
+            return await run_mpy_cross(args)
+
+        with patch.object(compile, "run_mpy_cross", slow_run_mpy_cross):
+            first = asyncio.ensure_future(compile_file(str(script)))
+            second = asyncio.ensure_future(compile_file(str(script)))
+
+            await version_requested.wait()
+            first.cancel()
+            release_version.set()
+
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+            return await second
+
+    with patch.object(compile, "_mpy_cross_versions", {}):
+        mpy = asyncio.run(main())
+
+    assert mpy[0] == ord("M")
+
+
+def test_compile_str(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    mpy = asyncio.run(compile_str("print('hello')"))
+
+    assert mpy[0] == ord("M")
+    assert b"hello" in mpy
+    # no build directory is left behind in the current working directory
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_make_build_dir_file_exists(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / compile.BUILD_DIR).touch()
+
+    with pytest.raises(FileExistsError):
+        compile.make_build_dir()
+
+
+def test_print_mpy(capsys):
+    compile.print_mpy(bytes(range(0x4D, 0x4D + 10)))
+
+    out = capsys.readouterr().out
+    assert out.endswith(
+        "\n"
+        "// MPY file. Version: 78. Size: 10 bytes\n"
+        "const uint8_t script[] = {\n"
+        "    0x4D, 0x4E, 0x4F, 0x50, 0x51, 0x52, 0x53, 0x54,\n"
+        "    0x55, 0x56,\n"
+        "};\n"
+    )
+
+
+def test_run_mpy_cross_without_subprocess_support():
+    async def main():
+        with patch(
+            "asyncio.create_subprocess_exec", side_effect=NotImplementedError
+        ) as create_subprocess_exec:
+            out = await compile.run_mpy_cross(["--version"])
+
+        create_subprocess_exec.assert_called_once()
+        return out
+
+    assert "mpy-cross" in asyncio.run(main())